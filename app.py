@@ -1,13 +1,43 @@
 from flask import redirect, url_for
-from flask import Flask, request, jsonify, render_template, redirect, url_for, session, flash
+from flask import Flask, Response, request, jsonify, render_template, redirect, url_for, session, flash, g
+from flask.json.provider import DefaultJSONProvider
+from flask.typing import ResponseReturnValue
+from concurrent.futures import Future, ThreadPoolExecutor
 from functools import wraps
+from typing import Any, Callable, Optional, Union
 import os
+import queue
+import socket
+import threading
+import time
+import orjson
+from cachetools import TTLCache
 import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import requote_uri
+from urllib3.util import connection as urllib3_connection
+from urllib3.util.retry import Retry
+from urllib.parse import urlparse
 from datetime import datetime
 import uuid
+from http.cookiejar import DefaultCookiePolicy
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (jsonify, request.get_json)."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
 
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Backend EHR service base URL
 # For local testing
@@ -15,65 +45,325 @@ EHR_BASE_URL = os.getenv("EHR_BASE_URL", "http://localhost:8001")
 
 app.secret_key = os.getenv("FLASK_SECRET", "dev-secret")  # needed for sessions
 
+# Default (connect, read) timeout in seconds for every upstream call.
+# Connecting fails fast so an unreachable backend does not tie up workers.
+UPSTREAM_TIMEOUT = (0.25, 5.0)
+
+# After this many consecutive connection failures or timeouts, upstream
+# calls fail immediately for BREAKER_RESET_TIMEOUT seconds
+BREAKER_FAIL_MAX = int(os.getenv("BREAKER_FAIL_MAX", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of contacting the backend while the breaker is open."""
+
+
+class CircuitBreaker:
+    """Counts consecutive upstream failures and opens after fail_max of them.
+
+    Once reset_timeout has passed, calls are let through again; the next
+    success closes the breaker and the next failure reopens it.
+    """
+
+    def __init__(self, fail_max: int, reset_timeout: float) -> None:
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout:
+                raise CircuitOpenError("Backend circuit open after repeated failures")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.fail_max:
+                self._opened_at = time.monotonic()
+
+
+class UpstreamSession(requests.Session):
+    """requests.Session that applies UPSTREAM_TIMEOUT unless a call overrides it,
+    encodes json= bodies with orjson and guards every send with a CircuitBreaker.
+
+    The timeout is applied in send() so prepared requests sent directly get it too.
+    """
+
+    def __init__(self, breaker: CircuitBreaker) -> None:
+        super().__init__()
+        self.breaker = breaker
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = UPSTREAM_TIMEOUT
+        self.breaker.before_call()
+        try:
+            res = super().send(request, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return res
+
+    def request(self, method: Union[str, bytes], url: Union[str, bytes], *args: Any, **kwargs: Any) -> requests.Response:
+        if kwargs.get("json") is not None:
+            kwargs["data"] = orjson.dumps(kwargs.pop("json"))
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+        return super().request(method, url, *args, **kwargs)
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets use TCP_NODELAY and SO_KEEPALIVE."""
+
+    socket_options = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def _resolve(host: Optional[str], port: int) -> list[str]:
+    # Every address for host, in getaddrinfo's order
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (OSError, UnicodeError):
+        return []
+    return list(dict.fromkeys(str(info[4][0]) for info in infos))
+
+
+# EHR backend addresses, resolved once at startup instead of on every new
+# upstream connection. Only the socket target changes, so TLS SNI and the
+# Host header still use the hostname.
+_backend_url = urlparse(EHR_BASE_URL)
+_backend_ips = _resolve(
+    _backend_url.hostname, _backend_url.port or (443 if _backend_url.scheme == "https" else 80))
+_resolved_hosts = {_backend_url.hostname: _backend_ips} if _backend_ips else {}
+_urllib3_create_connection = urllib3_connection.create_connection
+
+
+def _connect_any(ips: list[str], port: int, *args: Any, **kwargs: Any) -> socket.socket:
+    # Try each address in turn, as urllib3 does with a fresh lookup
+    error = OSError("no addresses to connect to")
+    for ip in ips:
+        try:
+            return _urllib3_create_connection((ip, port), *args, **kwargs)
+        except OSError as e:
+            error = e
+    raise error
+
+
+def _create_connection(address: tuple[str, int], *args: Any, **kwargs: Any) -> socket.socket:
+    host, port = address
+    ips = _resolved_hosts.get(host)
+    if not ips:
+        return _urllib3_create_connection(address, *args, **kwargs)
+    try:
+        return _connect_any(ips, port, *args, **kwargs)
+    except OSError:
+        # Retry only if the host has moved to new addresses
+        fresh = _resolve(host, port)
+        if not fresh or fresh == ips:
+            raise
+        _resolved_hosts[host] = fresh
+        return _connect_any(fresh, port, *args, **kwargs)
+
+
+urllib3_connection.create_connection = _create_connection
+
+
+def upstream_retry() -> Retry:
+    # Retried statuses are still passed through to the caller
+    return Retry(
+        total=2,
+        backoff_factor=0.1,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+    )
+
+
+# Requests one worker serves at once; gunicorn.conf.py reads the same setting
+# for its gevent worker_connections
+WORKER_CONNECTIONS = int(os.getenv("WORKER_CONNECTIONS", "1000"))
+
+# Connections kept per upstream host. This covers every request one worker
+# can have in flight, otherwise urllib3 discards the extra sockets and the
+# next calls pay for new handshakes. Sockets are only opened on demand.
+UPSTREAM_POOL_MAXSIZE = int(os.getenv("UPSTREAM_POOL_MAXSIZE", WORKER_CONNECTIONS))
+
+# One pooled session shared by all handlers, so upstream calls reuse
+# keep-alive TCP/TLS connections instead of opening a new one per request.
+# The EHR backend gets its own adapter so other hosts cannot starve it.
+SESSION = UpstreamSession(CircuitBreaker(BREAKER_FAIL_MAX, BREAKER_RESET_TIMEOUT))
+# Every user shares this session, so it must never keep backend cookies:
+# one user's Set-Cookie would otherwise be sent on everyone's calls
+SESSION.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+_default_adapter = KeepAliveAdapter(max_retries=upstream_retry())
+SESSION.mount("http://", _default_adapter)
+SESSION.mount("https://", _default_adapter)
+SESSION.mount(EHR_BASE_URL, KeepAliveAdapter(
+    pool_connections=1,
+    pool_maxsize=UPSTREAM_POOL_MAXSIZE,
+    max_retries=upstream_retry(),
+))
+
+# PUT /patients/<id> with the session's default headers already merged;
+# _put_patient copies it and fills in the URL, auth and body per call.
+_PUT_PATIENT_TEMPLATE = SESSION.prepare_request(requests.Request(
+    "PUT", f"{EHR_BASE_URL}/patients", headers={"Content-Type": "application/json"}))
+# send() skips the environment lookup Session.request does, so resolve the
+# proxies, verify and cert settings (REQUESTS_CA_BUNDLE etc.) for it once
+_PUT_PATIENT_SETTINGS = SESSION.merge_environment_settings(
+    _PUT_PATIENT_TEMPLATE.url, {}, None, None, None)
+
+# Worker pool for upstream calls that run alongside the request handling them
+# (greenlets under gunicorn's gevent worker, which monkey-patches threading).
+UPSTREAM_EXECUTOR = ThreadPoolExecutor(max_workers=UPSTREAM_POOL_MAXSIZE)
+
+# Largest number of operations accepted by /client/patient/$batch
+MAX_BATCH_SIZE = 50
+
+# Updates to the same patient by the same user that arrive within this many
+# seconds are merged into one backend PUT; every caller gets its response.
+# Set to 0 to send each update on its own.
+UPDATE_BATCH_WINDOW = float(os.getenv("UPDATE_BATCH_WINDOW", "0.02"))
+# Longest a caller waits for its batch; covers the window plus a PUT with
+# all of its retries
+UPDATE_WAIT_TIMEOUT = 30
+_pending_updates: dict = {}  # (patient_id, Authorization) -> pending batch
+_pending_lock = threading.Lock()
+
+# Patient reads started by /patient/access ahead of the redirect to
+# /patient, kept for PREFETCH_TTL seconds.
+PREFETCH_TTL = 10
+_prefetched: dict = {}  # (access_token, patient_id) -> (future, expires_at)
+_prefetch_lock = threading.Lock()
+
+# Successful patient reads, per patient and user, reused for READ_CACHE_TTL
+# seconds; dropped as soon as that patient is updated or deleted
+READ_CACHE_TTL = float(os.getenv("READ_CACHE_TTL", "2"))
+_read_cache: TTLCache = TTLCache(maxsize=1024, ttl=READ_CACHE_TTL)
+_read_cache_lock = threading.Lock()
+# patient_id -> successful writes seen. A generation only has to outlive the
+# reads in flight when it changes: three attempts at UPSTREAM_TIMEOUT plus
+# backoff stay well under WRITE_GENERATION_TTL.
+WRITE_GENERATION_TTL = 60
+_write_generations: TTLCache = TTLCache(maxsize=65536, ttl=WRITE_GENERATION_TTL)
+
+# (unix second, ISO string) for the most recent created_at timestamp
+_created_at_cache = (0, "")
+
+# Encoded /routes response, built on first request
+_routes_json = None
+
+# Form fields each role may change through the update pages
+DOCTOR_UPDATE_FIELDS = frozenset({"height", "weight", "blood_type", "notes"})
+PATIENT_UPDATE_FIELDS = frozenset({"notes", "email", "address"})
+
 # This login_required is a UI-level guard, not actual authorization
 
 
-def login_required(f):
+def login_required(f: Callable[..., ResponseReturnValue]) -> Callable[..., ResponseReturnValue]:
     @wraps(f)
-    def wrapper(*args, **kwargs):
+    def wrapper(*args: Any, **kwargs: Any) -> ResponseReturnValue:
         if "access_token" not in session:
-            return redirect(url_for("login"))
+            return redirect(url_for("login_page"))
         return f(*args, **kwargs)
     return wrapper
 
-# Auth headers function defining for authorization logic
+# API counterpart of login_required: the backend would reject a call without
+# a token anyway, so answer 401 here instead of making the round trip
 
 
-def auth_headers():
+def token_required(f: Callable[..., ResponseReturnValue]) -> Callable[..., ResponseReturnValue]:
+    @wraps(f)
+    def wrapper(*args: Any, **kwargs: Any) -> ResponseReturnValue:
+        if "access_token" not in session:
+            return jsonify({"error": "Authentication required"}), 401
+        return f(*args, **kwargs)
+    return wrapper
+
+# Auth headers for authorization logic, built once per request and shared
+# by every upstream call it makes; callers must not mutate the dict
+
+
+@app.before_request
+def load_auth_headers() -> None:
     token = session.get("access_token")
-    if not token:
-        return {}
-    return {
-        "Authorization": f"Bearer {token}"
-    }
+    g.auth_headers = {"Authorization": f"Bearer {token}"} if token else {}
 
 
 @app.route("/routes")
-def list_routes():
-    return {"routes": sorted([str(r) for r in app.url_map.iter_rules()])}
+def list_routes() -> ResponseReturnValue:
+    # The URL map is fixed once the app is serving, so encode it only once
+    global _routes_json
+    if _routes_json is None:
+        _routes_json = orjson.dumps({"routes": sorted(str(r) for r in app.url_map.iter_rules())})
+    return Response(_routes_json, mimetype="application/json")
 
 
 @app.route("/")
-def home():
+def home() -> ResponseReturnValue:
     return render_template("home.html")
 
 
 @app.route("/about")
-def about_page():
+def about_page() -> ResponseReturnValue:
     return render_template("about.html")
 
 # Health Check Endpoint
 
 
 @app.route("/health")
-def health():
+def health() -> ResponseReturnValue:
     return jsonify({"status": "ok", "service": "ehr-client"}), 200
 
 
-@app.route("/client/patient/create", methods=["POST"])
-def create_patient():
-    payload = request.get_json(silent=True) or {}
+# Patient service helpers
+# The /client/patient/* routes and the UI pages share these, so the UI no
+# longer calls this app's own API over HTTP. Each helper returns
+# (result, status): result is the backend response, or a dict built here
+# when validation fails or the backend is not reachable.
+ServiceBody = Union[dict, requests.Response]
+ServiceResult = tuple[ServiceBody, int]
+
 
+def _missing_fields(payload: dict) -> list[str]:
     # Input validation
     required_fields = ["patient_id", "name", "birth_date"]
-    missing = [
+    return [
         f for f in required_fields if f not in payload or payload.get(f) in (None, "")]
-    if missing:
-        return jsonify({"message": "Missing required data", "missing": missing}), 400
 
+
+def _created_at() -> str:
+    # Shared by every record created within the same second
+    global _created_at_cache
+    second = int(time.time())
+    if _created_at_cache[0] != second:
+        _created_at_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return _created_at_cache[1]
+
+
+def _record_ids(count: int) -> list[str]:
+    # Random (version 4) UUIDs from a single os.urandom read
+    rand = os.urandom(16 * count)
+    return [str(uuid.UUID(bytes=rand[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
+def _patient_record(payload: dict, record_id: str, created_at: str) -> dict:
     # Create record of the entered data
-    patient_information = {
-        "id": str(uuid.uuid4()),  # internal record id
+    return {
+        "id": record_id,  # internal record id
         # external patient id (or username)
         "patient_id": payload.get("patient_id"),
         "name": payload.get("name"),
@@ -81,107 +371,372 @@ def create_patient():
         "height": payload.get("height"),
         "weight": payload.get("weight"),
         "blood_type": payload.get("blood_type"),
-        "created_at": datetime.now().isoformat()
+        "created_at": created_at
     }
 
+
+def _post_patient(patient_information: dict, headers: dict) -> ServiceResult:
     # Forward to backend
     try:
-        backend_res = requests.post(
+        backend_res = SESSION.post(
             f"{EHR_BASE_URL}/patients",
             json=patient_information,
-            headers=auth_headers(),
-            timeout=5
+            headers=headers
         )
     except requests.RequestException as e:
-        return jsonify({"error": "Backend not reachable", "details": str(e)}), 503
+        return {"error": "Backend not reachable", "details": str(e)}, 503
 
-    # Return backend response to client
-    try:
-        return jsonify(backend_res.json()), backend_res.status_code
-    except ValueError:
-        return backend_res.text, backend_res.status_code
+    return backend_res, backend_res.status_code
 
 
-@app.route("/client/patient/<patient_id>", methods=["GET"])
-def read_patient_data(patient_id):
+def _svc_create_patient(payload: dict, headers: dict) -> ServiceResult:
+    missing = _missing_fields(payload)
+    if missing:
+        return {"message": "Missing required data", "missing": missing}, 400
+
+    return _post_patient(_patient_record(payload, _record_ids(1)[0], _created_at()), headers)
+
+
+def _forget_patient(patient_id: str) -> None:
+    # Drop every user's cached or prefetched read of this patient after a
+    # write, and bump its generation so reads already in flight do not cache
+    # the old record
+    with _read_cache_lock:
+        _write_generations[patient_id] = _write_generations.get(patient_id, 0) + 1
+        for key in [k for k in _read_cache if k[0] == patient_id]:
+            _read_cache.pop(key, None)
+    with _prefetch_lock:
+        for key in [k for k in _prefetched if k[1] == patient_id]:
+            del _prefetched[key]
+
+
+def _svc_read_patient(patient_id: Optional[str], headers: dict, stream: bool = False) -> ServiceResult:
+    # With stream=True the body is left unread for the caller to stream out,
+    # so the response is not cached
     if not patient_id:
-        return jsonify({"message": "patient_id is required"}), 400
+        return {"message": "patient_id is required"}, 400
+
+    key = (patient_id, headers.get("Authorization"))
+    with _read_cache_lock:
+        cached = _read_cache.get(key)
+        generation = _write_generations.get(patient_id, 0)
+    if cached is not None:
+        return cached, cached.status_code
 
     try:
-        backend_res = requests.get(
+        backend_res = SESSION.get(
             f"{EHR_BASE_URL}/patients/{patient_id}",
-            headers=auth_headers(),
-            timeout=5
+            headers=headers,
+            stream=stream
         )
     except requests.RequestException as e:
-        return jsonify({"error": "Backend not reachable", "details": str(e)}), 503
+        return {"error": "Backend not reachable", "details": str(e)}, 503
+
+    if backend_res.status_code == 200 and not stream:
+        with _read_cache_lock:
+            if _write_generations.get(patient_id, 0) == generation:
+                _read_cache[key] = backend_res
+
+    return backend_res, backend_res.status_code
+
 
+def _put_patient(patient_id: str, data: dict, headers: dict) -> ServiceResult:
+    # Build backend request from the prepared template
+    req = _PUT_PATIENT_TEMPLATE.copy()
+    req.url = requote_uri(f"{EHR_BASE_URL}/patients/{patient_id}")
+    req.headers.update(headers)
+    req.prepare_body(orjson.dumps(data), None)
+
+    # Forward request to backend (API Part)
     try:
-        return jsonify(backend_res.json()), backend_res.status_code
-    except ValueError:
-        return backend_res.text, backend_res.status_code
+        backend_res = SESSION.send(req, **_PUT_PATIENT_SETTINGS)
+    except requests.RequestException as e:
+        return {"error": "Backend not reachable", "details": str(e)}, 503
 
-# Update (UI and API Part)
+    if backend_res.ok:
+        _forget_patient(patient_id)
 
+    return backend_res, backend_res.status_code
 
-@app.route("/client/patient/update", methods=["PUT"])
-def update_patient():
-    # Read incoming JSON body from user/client
-    payload = request.get_json(silent=True) or {}
 
-    patient_id = payload.get("patient_id")
-    data = payload.get("data", {})
+def _flush_updates(key: tuple[str, Optional[str]]) -> None:
+    with _pending_lock:
+        batch = _pending_updates.pop(key)
+
+    # Waiters must always be released, whatever the PUT does
+    try:
+        result = _put_patient(key[0], batch["data"], batch["headers"])
+    except Exception as e:
+        result = {"error": "Update failed", "details": str(e)}, 500
+
+    for waiter in batch["waiters"]:
+        waiter.put(result)
+
 
+def _svc_update_patient(patient_id: Optional[str], data: dict, headers: dict) -> ServiceResult:
     # Validate inputs
     if not patient_id:
-        return jsonify({"error": "patient_id is required"}), 400
+        return {"error": "patient_id is required"}, 400
     if not isinstance(data, dict) or len(data) == 0:
-        return jsonify({"error": "data must be a non-empty JSON object"}), 400
+        return {"error": "data must be a non-empty JSON object"}, 400
+    # JSON callers may send a numeric id; the read cache is keyed by the URL's string
+    patient_id = str(patient_id)
+
+    if UPDATE_BATCH_WINDOW <= 0:
+        return _put_patient(patient_id, data, headers)
+
+    # Join (or open) the pending batch for this patient and user, then wait
+    # for the timer to send it
+    waiter: queue.Queue = queue.Queue(maxsize=1)
+    key = (patient_id, headers.get("Authorization"))
+    with _pending_lock:
+        opened = key not in _pending_updates
+        if opened:
+            _pending_updates[key] = {"data": {}, "headers": headers, "waiters": []}
+        batch = _pending_updates[key]
+        batch["data"].update(data)
+        batch["waiters"].append(waiter)
+
+    if opened:
+        try:
+            threading.Timer(UPDATE_BATCH_WINDOW, _flush_updates, args=(key,)).start()
+        except Exception:
+            # No timer means nobody would send the batch; send it now
+            _flush_updates(key)
+
+    try:
+        return waiter.get(timeout=UPDATE_WAIT_TIMEOUT)
+    except queue.Empty:
+        return {"error": "Update timed out waiting for the backend"}, 504
 
-    # Build backend URL
+
+def _svc_delete_patient(patient_id: str, headers: dict) -> ServiceResult:
     backend_url = f"{EHR_BASE_URL}/patients/{patient_id}"
 
-    # Forward request to backend (API Part)
     try:
-        backend_res = requests.put(
+        backend_res = SESSION.delete(
             backend_url,
-            json=data,
-            headers=auth_headers(),
-            timeout=5
+            headers=headers
         )
     except requests.RequestException as e:
-        return jsonify({"error": "Backend not reachable", "details": str(e)}), 503
+        return {"error": "Backend not reachable", "details": str(e)}, 503
 
-    # Return backend response to the caller
-    try:
-        return jsonify(backend_res.json()), backend_res.status_code
-    except ValueError:
-        return backend_res.text, backend_res.status_code
+    if backend_res.ok:
+        _forget_patient(patient_id)
 
-# Delete (UI and API Part)
+    return backend_res, backend_res.status_code
 
 
-@app.route("/client/patient/delete/<patient_id>", methods=["DELETE"])
-def delete_patient(patient_id):
-    backend_url = f"{EHR_BASE_URL}/patients/{patient_id}"
+def _start_prefetch(token: Optional[str], patient_id: str, headers: dict) -> None:
+    now = time.monotonic()
+    future = UPSTREAM_EXECUTOR.submit(_svc_read_patient, patient_id, headers)
+    with _prefetch_lock:
+        for key in [k for k, (_, expires) in _prefetched.items() if expires <= now]:
+            del _prefetched[key]
+        _prefetched[(token, patient_id)] = (future, now + PREFETCH_TTL)
 
-    try:
-        backend_res = requests.delete(
-            backend_url,
-            headers=auth_headers(),
-            timeout=5
+
+def _take_prefetch(token: Optional[str], patient_id: str) -> Optional[Future]:
+    # A prefetched read is used once; later page loads fetch fresh data
+    with _prefetch_lock:
+        future, expires = _prefetched.pop((token, patient_id), (None, 0))
+    if future is None or expires <= time.monotonic():
+        return None
+    return future
+
+
+def _svc_response(result: ServiceBody, status: int) -> ResponseReturnValue:
+    # Return backend response to the caller, passing its body through as-is
+    if isinstance(result, requests.Response):
+        return Response(
+            result.content,
+            status=status,
+            content_type=result.headers.get("content-type", "application/json"),
         )
-    except requests.RequestException as e:
-        return jsonify({"error": "Backend not reachable", "details": str(e)}), 503
+    return jsonify(result), status
 
-    try:
-        return jsonify(backend_res.json()), backend_res.status_code
-    except ValueError:
-        return backend_res.text, backend_res.status_code
+
+def _svc_json(result: ServiceBody) -> Any:
+    # Decoded body of a service result, for the UI pages
+    if isinstance(result, requests.Response):
+        try:
+            return orjson.loads(result.content)
+        except ValueError:
+            return {}
+    return result
+
+
+def _svc_text(result: ServiceBody) -> str:
+    # Raw body of a service result, for UI error messages
+    if isinstance(result, requests.Response):
+        return result.text
+    return orjson.dumps(result).decode()
+
+
+@app.route("/client/patient/create", methods=["POST"])
+@token_required
+def create_patient() -> ResponseReturnValue:
+    payload = request.get_json(silent=True) or {}
+    return _svc_response(*_svc_create_patient(payload, g.auth_headers))
+
+
+@app.route("/client/patient/<patient_id>", methods=["GET"])
+@token_required
+def read_patient_data(patient_id: str) -> ResponseReturnValue:
+    result, status = _svc_read_patient(patient_id, g.auth_headers, stream=True)
+    if isinstance(result, requests.Response):
+        resp = Response(
+            result.iter_content(chunk_size=16384),
+            status=status,
+            content_type=result.headers.get("content-type", "application/json"),
+        )
+        # Return (or drop) the backend connection once the server closes the
+        # body, even if it never iterated it (HEAD requests)
+        resp.call_on_close(result.close)
+        return resp
+    return _svc_response(result, status)
+
+# Update (UI and API Part)
+
+
+@app.route("/client/patient/update", methods=["PUT"])
+@token_required
+def update_patient() -> ResponseReturnValue:
+    # Read incoming JSON body from user/client
+    payload = request.get_json(silent=True) or {}
+
+    patient_id = payload.get("patient_id")
+    data = payload.get("data", {})
+
+    return _svc_response(*_svc_update_patient(patient_id, data, g.auth_headers))
+
+# Delete (UI and API Part)
+
+
+@app.route("/client/patient/delete/<patient_id>", methods=["DELETE"])
+@token_required
+def delete_patient(patient_id: str) -> ResponseReturnValue:
+    return _svc_response(*_svc_delete_patient(patient_id, g.auth_headers))
+
+
+# Batch (API Part)
+# Runs several patient operations in one round trip. Entries for different
+# patients are sent to the backend concurrently; entries for the same
+# patient run one after another in the order given.
+
+
+def _svc_batch_entry(entry: object, headers: dict) -> ServiceResult:
+    if not isinstance(entry, dict):
+        return {"error": "batch entry must be a JSON object"}, 400
+
+    method = str(entry.get("method", "")).upper()
+    parts = str(entry.get("url", "")).strip("/").split("/")
+    body = entry.get("body", {})
+    if method in ("POST", "PUT") and not isinstance(body, dict):
+        return {"error": "batch entry body must be a JSON object"}, 400
+
+    if parts == ["patients"] and method == "POST":
+        return _svc_create_patient(body, headers)
+    if len(parts) == 2 and parts[0] == "patients":
+        if method == "GET":
+            return _svc_read_patient(parts[1], headers)
+        if method == "PUT":
+            return _svc_update_patient(parts[1], body, headers)
+        if method == "DELETE":
+            return _svc_delete_patient(parts[1], headers)
+    return {"error": f"Unsupported batch entry: {method} {entry.get('url')}"}, 400
+
+
+def _batch_patient_id(entry: object) -> Optional[str]:
+    # Patient an entry works on, or None for creates and malformed entries
+    if isinstance(entry, dict):
+        parts = str(entry.get("url", "")).strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "patients":
+            return parts[1]
+    return None
+
+
+def _run_batch_entries(entries: list, headers: dict) -> list[ServiceResult]:
+    # An exception only fails its own entry, so the caller still learns
+    # which of the other writes went through
+    results = []
+    for entry in entries:
+        try:
+            results.append(_svc_batch_entry(entry, headers))
+        except Exception as e:
+            results.append(({"error": "Batch entry failed", "details": str(e)}, 500))
+    return results
+
+
+@app.route("/client/patient/$batch", methods=["POST"])
+@token_required
+def batch_patients() -> ResponseReturnValue:
+    payload = request.get_json(silent=True)
+    entries = payload.get("requests") if isinstance(payload, dict) else None
+
+    if not isinstance(entries, list) or len(entries) == 0:
+        return jsonify({"error": "requests must be a non-empty JSON array"}), 400
+    if len(entries) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"at most {MAX_BATCH_SIZE} requests per batch"}), 400
+
+    # Group entry positions by patient; each group runs in order on its own worker
+    groups: dict = {}
+    for index, entry in enumerate(entries):
+        patient_id = _batch_patient_id(entry)
+        groups.setdefault(index if patient_id is None else ("patient", patient_id), []).append(index)
+
+    headers = g.auth_headers
+    futures = [
+        (indexes, UPSTREAM_EXECUTOR.submit(_run_batch_entries, [entries[i] for i in indexes], headers))
+        for indexes in groups.values()
+    ]
+
+    responses: list = [None] * len(entries)
+    for indexes, future in futures:
+        for index, (result, status) in zip(indexes, future.result()):
+            responses[index] = {"status": status, "body": _svc_json(result)}
+
+    return jsonify({"responses": responses}), 200
+
+
+@app.route("/client/patient/bulk-create", methods=["POST"])
+@token_required
+def bulk_create_patients() -> ResponseReturnValue:
+    payloads = request.get_json(silent=True)
+
+    if not isinstance(payloads, list) or len(payloads) == 0:
+        return jsonify({"error": "body must be a non-empty JSON array"}), 400
+    if len(payloads) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"at most {MAX_BATCH_SIZE} patients per request"}), 400
+
+    errors = []
+    for index, payload in enumerate(payloads):
+        missing = _missing_fields(payload if isinstance(payload, dict) else {})
+        if missing:
+            errors.append({"index": index, "missing": missing})
+    if errors:
+        return jsonify({"message": "Missing required data", "errors": errors}), 400
+
+    # One id read and one timestamp for the whole batch
+    created_at = _created_at()
+    records = [
+        _patient_record(payload, record_id, created_at)
+        for payload, record_id in zip(payloads, _record_ids(len(payloads)))
+    ]
+
+    headers = g.auth_headers
+    futures = [UPSTREAM_EXECUTOR.submit(_post_patient, record, headers) for record in records]
+
+    responses = []
+    for future in futures:
+        result, status = future.result()
+        responses.append({"status": status, "body": _svc_json(result)})
+
+    return jsonify({"responses": responses}), 200
 
 
 @app.route("/login", methods=["GET", "POST"])
-def login_page():
+def login_page() -> ResponseReturnValue:
     if request.method == "GET":
         return render_template("login.html")
 
@@ -194,13 +749,12 @@ def login_page():
         return redirect(url_for("login_page"))
 
     try:
-        res = requests.post(
+        res = SESSION.post(
             f"{EHR_BASE_URL}/auth/login",
             json={
                 "username": username,
                 "password": password,
-            },
-            timeout=5,
+            }
         )
     except requests.RequestException:
         flash("Authentication service unavailable")
@@ -210,7 +764,7 @@ def login_page():
         flash("Invalid username or password")
         return redirect(url_for("login_page"))
 
-    data = res.json()
+    data = orjson.loads(res.content)
 
     # Store JWT in Flask session
     session["access_token"] = data["access_token"]
@@ -221,24 +775,17 @@ def login_page():
 
 @app.route("/doctor")
 @login_required
-def doctor_page():
+def doctor_page() -> ResponseReturnValue:
     view_patient_id = request.args.get("view_patient_id")
     patient = None
     error = None
 
     if view_patient_id:
-        try:
-            res = requests.get(
-                f"http://127.0.0.1:5002/client/patient/{view_patient_id}",
-                headers=auth_headers(),
-                timeout=5
-            )
-            if res.status_code == 200:
-                patient = res.json().get("patient")
-            else:
-                error = f"Could not load patient: {res.text}"
-        except requests.RequestException as e:
-            error = f"Client API not reachable: {e}"
+        result, status = _svc_read_patient(view_patient_id, g.auth_headers)
+        if status == 200:
+            patient = _svc_json(result).get("patient")
+        else:
+            error = f"Could not load patient: {_svc_text(result)}"
 
     return render_template(
         "doctor.html",
@@ -250,7 +797,7 @@ def doctor_page():
 
 @app.route("/doctor/create-patient", methods=["POST"])
 @login_required
-def doctor_create_patient():
+def doctor_create_patient() -> ResponseReturnValue:
     # Read form data from UI
     payload = {
         "patient_id": request.form.get("patient_id"),
@@ -261,26 +808,15 @@ def doctor_create_patient():
         "blood_type": request.form.get("blood_type"),
     }
 
-    try:
-        res = requests.post(
-            "http://127.0.0.1:5002/client/patient/create",
-            json=payload,
-            headers=auth_headers(),
-            timeout=5
-        )
-    except requests.RequestException as e:
-        return render_template(
-            "doctor.html",
-            error="Client API not reachable"
-        )
+    result, status = _svc_create_patient(payload, g.auth_headers)
 
-    if res.status_code not in (200, 201):
+    if status not in (200, 201):
         return render_template(
             "doctor.html",
-            error=f"Failed to create patient: {res.text}"
+            error=f"Failed to create patient: {_svc_text(result)}"
         )
 
-    data = res.json()
+    data = _svc_json(result)
     created_patient = data.get("patient")
 
     return redirect(url_for("doctor_page", view_patient_id=created_patient.get("id")))
@@ -288,29 +824,15 @@ def doctor_create_patient():
 
 @app.route("/doctor/update-patient", methods=["POST"])
 @login_required
-def doctor_update_patient():
+def doctor_update_patient() -> ResponseReturnValue:
     patient_id = request.form.get("patient_id")
 
-    data = {}
-    for field in ["height", "weight", "blood_type", "notes"]:
-        val = request.form.get(field)
-        if val not in (None, ""):
-            data[field] = val
+    data = {k: v for k, v in request.form.items() if k in DOCTOR_UPDATE_FIELDS and v != ""}
 
-    payload = {"patient_id": patient_id, "data": data}
-
-    try:
-        res = requests.put(
-            "http://127.0.0.1:5002/client/patient/update",
-            json=payload,
-            headers=auth_headers,
-            timeout=5
-        )
-    except requests.RequestException as e:
-        return redirect(url_for("doctor_page", view_patient_id=patient_id, error=f"Client API not reachable: {e}"))
+    result, status = _svc_update_patient(patient_id, data, g.auth_headers)
 
-    if res.status_code not in (200, 201):
-        return redirect(url_for("doctor_page", view_patient_id=patient_id, error=f"Update failed: {res.text}"))
+    if status not in (200, 201):
+        return redirect(url_for("doctor_page", view_patient_id=patient_id, error=f"Update failed: {_svc_text(result)}"))
 
     # Reload the same patient to see the update work
     return redirect(url_for("doctor_page", view_patient_id=patient_id, success="Patient updated successfully"))
@@ -318,7 +840,7 @@ def doctor_update_patient():
 
 @app.route("/patient")
 @login_required
-def patient_page():
+def patient_page() -> ResponseReturnValue:
     # patient_id could come from session later; for now read query or session
     patient_id = request.args.get("patient_id")
     patient = None
@@ -326,70 +848,60 @@ def patient_page():
     success = request.args.get("success")
 
     if patient_id:
-        try:
-            res = requests.get(
-                f"http://127.0.0.1:5002/client/patient/{patient_id}",
-                headers=auth_headers(),
-                timeout=5
-            )
-            if res.status_code == 200:
-                patient = res.json().get("patient")
-            else:
-                error = f"Could not load patient: {res.text}"
-        except requests.RequestException as e:
-            error = f"Client API not reachable: {e}"
+        future = _take_prefetch(session.get("access_token"), patient_id)
+        if future is not None:
+            result, status = future.result()
+        else:
+            result, status = _svc_read_patient(patient_id, g.auth_headers)
+        if status == 200:
+            patient = _svc_json(result).get("patient")
+        else:
+            error = f"Could not load patient: {_svc_text(result)}"
 
     return render_template("patient.html", patient_id=patient_id, patient=patient, error=error, success=success)
 
 
 @app.route("/patient/access", methods=["POST"])
 @login_required
-def patient_access():
+def patient_access() -> ResponseReturnValue:
     patient_id = request.form.get("patient_id")
+
+    # Start loading the record now; patient_page picks it up after the redirect
+    if patient_id:
+        _start_prefetch(session.get("access_token"), patient_id, g.auth_headers)
+
     return redirect(url_for("patient_page", patient_id=patient_id))
 
 
 @app.route("/patient/update", methods=["POST"])
 @login_required
-def patient_update():
+def patient_update() -> ResponseReturnValue:
     patient_id = request.form.get("patient_id")
 
     # non-critical fields only
-    data = {}
-    for field in ["notes", "email", "address"]:
-        val = request.form.get(field)
-        if val not in (None, ""):
-            data[field] = val
-
-    payload = {"patient_id": patient_id, "data": data}
+    data = {k: v for k, v in request.form.items() if k in PATIENT_UPDATE_FIELDS and v != ""}
 
-    try:
-        res = requests.put(
-            "http://127.0.0.1:5002/client/patient/update",
-            json=payload,
-            headers=auth_headers(),
-            timeout=5)
-    except requests.RequestException as e:
-        return redirect(url_for("patient_page", patient_id=patient_id, error=f"Client API not reachable: {e}"))
+    result, status = _svc_update_patient(patient_id, data, g.auth_headers)
 
-    if res.status_code not in (200, 201):
-        return redirect(url_for("patient_page", patient_id=patient_id, error=f"Update failed: {res.text}"))
+    if status not in (200, 201):
+        return redirect(url_for("patient_page", patient_id=patient_id, error=f"Update failed: {_svc_text(result)}"))
 
     return redirect(url_for("patient_page", patient_id=patient_id, success="Saved successfully"))
 
 
 @app.route("/patient/logout")
 @login_required
-def patient_logout():
+def patient_logout() -> ResponseReturnValue:
     return redirect("/login")
 
 
 @app.route("/logout")
 @login_required
-def logout():
+def logout() -> ResponseReturnValue:
     session.clear()
     return redirect(url_for("login_page"))
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5002, debug=True)
+    # Local smoke runs only; deploy with gunicorn (see gunicorn.conf.py)
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", "5002")), debug=False, use_reloader=False)
@@ -0,0 +1,13 @@
+# Gunicorn config: gunicorn app:app
+# Handlers spend almost all their time waiting on the EHR backend, so gevent
+# workers let each process serve many requests while upstream I/O is pending.
+# The gevent worker monkey-patches the standard library before it imports
+# app.py, so the app itself never patches at import time.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5002')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gevent"
+# app.py sizes its upstream connection pool from the same setting
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", "1000"))
@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubBackend(BaseHTTPRequestHandler):
+    """In-memory stand-in for the EHR backend service."""
+
+    protocol_version = "HTTP/1.1"
+    patients = {}
+    calls = []  # (method, path, headers)
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=()):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _record(self):
+        self.calls.append((self.command, self.path, self.headers))
+
+    def do_POST(self):
+        self._record()
+        body = self._body()
+        if self.path == "/auth/login":
+            return self._send(
+                200,
+                {"access_token": f"token-{body['username']}", "role": "doctor"},
+                [("Set-Cookie", f"backend_sid={body['username']}-session; Path=/")],
+            )
+        self.patients[body["id"]] = body
+        self._send(201, {"patient": body})
+
+    def do_GET(self):
+        self._record()
+        patient = self.patients.get(self.path.rsplit("/", 1)[1])
+        if patient is None:
+            return self._send(404, {"detail": "not found"})
+        self._send(200, {"patient": patient})
+
+    do_HEAD = do_GET
+
+    def do_PUT(self):
+        self._record()
+        patient = self.patients.get(self.path.rsplit("/", 1)[1])
+        body = self._body()
+        if patient is None:
+            return self._send(404, {"detail": "not found"})
+        patient.update(body)
+        self._send(200, {"patient": patient})
+
+    def do_DELETE(self):
+        self._record()
+        self.patients.pop(self.path.rsplit("/", 1)[1], None)
+        self._send(200, {"deleted": True})
+
+
+# The app reads EHR_BASE_URL at import time, so the stub must be listening first
+_server = ThreadingHTTPServer(("127.0.0.1", 0), StubBackend)
+threading.Thread(target=_server.serve_forever, daemon=True).start()
+os.environ["EHR_BASE_URL"] = f"http://127.0.0.1:{_server.server_address[1]}"
+# Only consulted for HTTPS, but every upstream call should carry it
+CA_BUNDLE = "/tmp/ehr-test-ca.pem"
+os.environ["REQUESTS_CA_BUNDLE"] = CA_BUNDLE
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as ehr_app  # noqa: E402
+
+
+@pytest.fixture
+def backend():
+    StubBackend.patients.clear()
+    StubBackend.calls.clear()
+    return StubBackend
+
+
+@pytest.fixture
+def app_module(backend, monkeypatch):
+    monkeypatch.setattr(ehr_app.SESSION, "breaker", ehr_app.CircuitBreaker(
+        ehr_app.BREAKER_FAIL_MAX, ehr_app.BREAKER_RESET_TIMEOUT))
+    ehr_app._read_cache.clear()
+    ehr_app._prefetched.clear()
+    return ehr_app
+
+
+def upstream_calls(backend, method):
+    return [call for call in backend.calls if call[0] == method]
+
+
+def create_patient(client, patient_id="p1"):
+    res = client.post("/client/patient/create", json={
+        "patient_id": patient_id, "name": "Ada", "birth_date": "1990-01-01"})
+    assert res.status_code == 201
+    return res.get_json()["patient"]["id"]
+
+
+def login(client, username):
+    res = client.post("/login", data={"username": username, "password": "pw"})
+    assert res.status_code == 302
+    return client
+
+
+@pytest.fixture
+def client(app_module):
+    return login(app_module.app.test_client(), "alice")
@@ -0,0 +1,163 @@
+import uuid
+
+from werkzeug.test import EnvironBuilder
+
+from conftest import CA_BUNDLE, create_patient, login, upstream_calls
+
+
+def test_backend_cookies_are_not_shared_between_users(app_module, backend):
+    login(app_module.app.test_client(), "alice")
+    bob = login(app_module.app.test_client(), "bob")
+    backend.calls.clear()
+
+    bob.get("/client/patient/zzz")
+
+    (_, _, headers), = upstream_calls(backend, "GET")
+    assert headers.get("Cookie") is None
+    assert headers.get("Authorization") == "Bearer token-bob"
+
+
+def test_batch_rejects_non_object_body_per_entry(client):
+    res = client.post("/client/patient/$batch", json={"requests": [
+        {"method": "POST", "url": "/patients", "body": 5},
+        {"method": "POST", "url": "/patients",
+         "body": {"patient_id": "p2", "name": "Bo", "birth_date": "1991-01-01"}},
+    ]})
+
+    assert res.status_code == 200
+    assert [r["status"] for r in res.get_json()["responses"]] == [400, 201]
+
+
+def test_batch_entry_exception_only_fails_that_entry(client, app_module, monkeypatch):
+    record_id = create_patient(client)
+
+    def broken_delete(patient_id, headers):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(app_module, "_svc_delete_patient", broken_delete)
+    res = client.post("/client/patient/$batch", json={"requests": [
+        {"method": "DELETE", "url": "/patients/other"},
+        {"method": "PUT", "url": f"/patients/{record_id}", "body": {"height": "180"}},
+    ]})
+
+    assert res.status_code == 200
+    first, second = res.get_json()["responses"]
+    assert first["status"] == 500 and "boom" in first["body"]["details"]
+    assert second["status"] == 200
+
+
+def test_batch_runs_entries_for_one_patient_in_order(client, backend):
+    record_id = create_patient(client)
+
+    res = client.post("/client/patient/$batch", json={"requests": [
+        {"method": "PUT", "url": f"/patients/{record_id}", "body": {"weight": "70"}},
+        {"method": "GET", "url": f"/patients/{record_id}"},
+    ]})
+
+    assert res.get_json()["responses"][1]["body"]["patient"]["weight"] == "70"
+
+
+def test_cached_backend_addresses_are_tried_in_order(client, app_module, backend, monkeypatch):
+    # First address refuses the connection, as ::1 does for an IPv4-only backend
+    addresses = ["::1", "127.0.0.1"]
+    monkeypatch.setitem(app_module._resolved_hosts, "127.0.0.1", addresses)
+    monkeypatch.setattr(app_module, "_resolve", lambda host, port: addresses)
+    app_module.SESSION.get_adapter(app_module.EHR_BASE_URL).poolmanager.clear()
+
+    res = client.get("/client/patient/abc")
+
+    assert res.status_code == 404
+    assert upstream_calls(backend, "GET")
+
+
+def test_unread_streamed_read_releases_the_connection(client, app_module):
+    # For HEAD, a WSGI server may close the body without ever iterating it
+    record_id = create_patient(client)
+    pools = app_module.SESSION.get_adapter(app_module.EHR_BASE_URL).poolmanager.pools
+
+    def opened_connections():
+        return sum(pool.num_connections for pool in pools._container.values())
+
+    client.get(f"/client/patient/{record_id}")
+    opened = opened_connections()
+    environ = EnvironBuilder(path=f"/client/patient/{record_id}", method="HEAD").get_environ()
+    environ["HTTP_COOKIE"] = "; ".join(f"{c.key}={c.value}" for c in client._cookies.values())
+
+    for _ in range(3):
+        body = app_module.app.wsgi_app(environ, lambda status, headers, exc_info=None: None)
+        body.close()
+
+    assert client.get(f"/client/patient/{record_id}").get_json()["patient"]["id"] == record_id
+    assert opened_connections() == opened
+
+
+def test_put_uses_environment_settings_like_other_calls(client, app_module, monkeypatch):
+    record_id = create_patient(client)
+    adapter = app_module.SESSION.get_adapter(app_module.EHR_BASE_URL)
+    real_send = adapter.send
+    verify = {}
+
+    def send(request, **kwargs):
+        verify[request.method] = kwargs.get("verify")
+        return real_send(request, **kwargs)
+
+    monkeypatch.setattr(adapter, "send", send)
+    client.put("/client/patient/update", json={"patient_id": record_id, "data": {"height": "180"}})
+    client.delete(f"/client/patient/delete/{record_id}")
+
+    assert verify == {"PUT": CA_BUNDLE, "DELETE": CA_BUNDLE}
+
+
+def _new_patient(patient_id):
+    return {"patient_id": patient_id, "name": "Ada", "birth_date": "1990-01-01"}
+
+
+def test_bulk_create_posts_every_patient(client, backend):
+    res = client.post("/client/patient/bulk-create", json=[_new_patient("p1"), _new_patient("p2")])
+
+    assert res.status_code == 200
+    assert [r["status"] for r in res.get_json()["responses"]] == [201, 201]
+    assert sorted(p["patient_id"] for p in backend.patients.values()) == ["p1", "p2"]
+
+
+def test_bulk_create_reports_missing_fields_per_index(client, backend):
+    res = client.post("/client/patient/bulk-create", json=[
+        _new_patient("p1"), {"name": "Bo"}, 5])
+
+    assert res.status_code == 400
+    assert res.get_json()["errors"] == [
+        {"index": 1, "missing": ["patient_id", "birth_date"]},
+        {"index": 2, "missing": ["patient_id", "name", "birth_date"]},
+    ]
+    assert not backend.patients
+
+
+def test_bulk_create_rejects_bad_bodies(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_BATCH_SIZE", 2)
+
+    for body in ({"patient_id": "p1"}, [], [_new_patient(f"p{i}") for i in range(3)]):
+        assert client.post("/client/patient/bulk-create", json=body).status_code == 400
+
+
+def test_bulk_create_shares_created_at_with_distinct_v4_ids(client):
+    res = client.post("/client/patient/bulk-create", json=[_new_patient(f"p{i}") for i in range(3)])
+
+    records = [r["body"]["patient"] for r in res.get_json()["responses"]]
+    assert len({r["created_at"] for r in records}) == 1
+    assert len({r["id"] for r in records}) == 3
+    assert all(uuid.UUID(r["id"]).version == 4 for r in records)
+
+
+def test_anonymous_api_call_is_rejected_without_backend_call(app_module, backend):
+    anonymous = app_module.app.test_client()
+
+    assert anonymous.get("/client/patient/p1").status_code == 401
+    assert anonymous.put("/client/patient/update", json={"patient_id": "p1", "data": {"a": 1}}).status_code == 401
+    assert not backend.calls
+
+
+def test_logged_out_page_redirects_to_login(app_module):
+    res = app_module.app.test_client().get("/doctor")
+
+    assert res.status_code == 302
+    assert res.headers["Location"] == "/login"
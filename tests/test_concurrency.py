@@ -0,0 +1,151 @@
+import socket
+import threading
+import time
+
+import pytest
+import requests
+
+from conftest import create_patient, upstream_calls
+
+AUTH = {"Authorization": "Bearer token-alice"}
+
+
+def test_updates_inside_window_become_one_put(client, app_module, backend, monkeypatch):
+    record_id = create_patient(client)
+    monkeypatch.setattr(app_module, "UPDATE_BATCH_WINDOW", 0.2)
+    results = []
+
+    def update(field, value):
+        results.append(app_module._svc_update_patient(record_id, {field: value}, AUTH))
+
+    threads = [threading.Thread(target=update, args=args) for args in (("height", "180"), ("weight", "70"))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(upstream_calls(backend, "PUT")) == 1
+    assert [status for _, status in results] == [200, 200]
+    assert results[0][0] is results[1][0]
+    assert backend.patients[record_id]["height"] == "180"
+    assert backend.patients[record_id]["weight"] == "70"
+    assert not app_module._pending_updates
+
+
+def test_update_is_sent_when_timer_cannot_start(client, app_module, backend, monkeypatch):
+    record_id = create_patient(client)
+
+    class BrokenTimer:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def start(self):
+            raise RuntimeError("can't start new thread")
+
+    monkeypatch.setattr(app_module.threading, "Timer", BrokenTimer)
+    result, status = app_module._svc_update_patient(record_id, {"height": "180"}, AUTH)
+
+    assert status == 200
+    assert len(upstream_calls(backend, "PUT")) == 1
+    assert not app_module._pending_updates
+
+
+def _closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/patients/x"
+
+
+def test_breaker_opens_after_fail_max_and_closes_after_success(app_module):
+    breaker = app_module.CircuitBreaker(fail_max=2, reset_timeout=0.1)
+    session = app_module.UpstreamSession(breaker)
+    dead_url = _closed_port_url()
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError) as exc:
+            session.get(dead_url)
+        assert not isinstance(exc.value, app_module.CircuitOpenError)
+    with pytest.raises(app_module.CircuitOpenError):
+        session.get(dead_url)
+
+    time.sleep(0.15)
+    assert session.get(f"{app_module.EHR_BASE_URL}/patients/missing").status_code == 404
+
+    # Closed again: one more failure is not enough to reopen it
+    with pytest.raises(requests.ConnectionError) as exc:
+        session.get(dead_url)
+    assert not isinstance(exc.value, app_module.CircuitOpenError)
+    with pytest.raises(requests.ConnectionError) as exc:
+        session.get(dead_url)
+    assert not isinstance(exc.value, app_module.CircuitOpenError)
+
+
+def test_write_invalidates_cached_read(client, app_module, backend):
+    record_id = create_patient(client)
+    assert client.get(f"/doctor?view_patient_id={record_id}").status_code == 200
+    assert client.get(f"/doctor?view_patient_id={record_id}").status_code == 200
+    assert len(upstream_calls(backend, "GET")) == 1
+
+    client.post("/doctor/update-patient", data={"patient_id": record_id, "notes": "updated"})
+    page = client.get(f"/doctor?view_patient_id={record_id}")
+
+    assert b"updated" in page.data
+    assert len(upstream_calls(backend, "GET")) == 2
+
+
+def test_read_racing_a_write_is_not_cached(client, app_module, monkeypatch):
+    record_id = create_patient(client)
+    real_get = app_module.SESSION.get
+
+    def get_while_patient_is_written(url, **kwargs):
+        res = real_get(url, **kwargs)
+        app_module._forget_patient(record_id)  # a write lands mid-read
+        return res
+
+    monkeypatch.setattr(app_module.SESSION, "get", get_while_patient_is_written)
+    result, status = app_module._svc_read_patient(record_id, AUTH)
+
+    assert status == 200
+    assert not app_module._read_cache
+
+
+def test_update_with_numeric_id_invalidates_cached_read(client, app_module, backend):
+    backend.patients["123"] = {"id": "123", "notes": "old"}
+    assert b"old" in client.get("/doctor?view_patient_id=123").data
+
+    res = client.put("/client/patient/update", json={"patient_id": 123, "data": {"notes": "new"}})
+    page = client.get("/doctor?view_patient_id=123")
+
+    assert res.status_code == 200
+    assert b"new" in page.data
+    assert len(upstream_calls(backend, "GET")) == 2
+
+
+def _access_and_wait(client, app_module, record_id):
+    client.post("/patient/access", data={"patient_id": record_id})
+    for future, _ in list(app_module._prefetched.values()):
+        future.result()
+
+
+def test_access_prefetch_serves_the_page_load(client, app_module, backend):
+    record_id = create_patient(client)
+
+    _access_and_wait(client, app_module, record_id)
+    assert len(upstream_calls(backend, "GET")) == 1
+    app_module._read_cache.clear()  # only the prefetch can serve the page now
+    page = client.get(f"/patient?patient_id={record_id}")
+
+    assert record_id.encode() in page.data
+    assert len(upstream_calls(backend, "GET")) == 1
+
+
+def test_write_invalidates_prefetched_read(client, app_module, backend):
+    record_id = create_patient(client)
+
+    _access_and_wait(client, app_module, record_id)
+    page = client.post("/patient/update", data={"patient_id": record_id, "notes": "after save"},
+                       follow_redirects=True)
+
+    assert b"Saved successfully" in page.data
+    assert b"after save" in page.data
+    assert not app_module._prefetched